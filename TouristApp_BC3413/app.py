@@ -3,15 +3,15 @@ warnings.filterwarnings("ignore", message=".*urllib3 v2 only supports OpenSSL.*"
 from flask import Flask, render_template, request, redirect, url_for, session, flash, Response, jsonify
 from typing import Optional
 import re
-from feature_cuisines import CuisineFeatureHandler, CuisinePreferences
+from feature_cuisines import CuisinePreferences, get_handler
 from feature_onboarding import TouristProfileDA, TouristProfile
-from features_location import LocationPlanner, haversine_km
+from features_location import LocationPlanner, haversine_km_array
 from features_reviews import ReviewFeature
 from features_closure import HawkerClosureFeature
 from datetime import datetime, timedelta
 import pandas as pd,json
+import numpy as np
 import os
-import csv
 from collections import Counter
 import sqlite3
 from functools import wraps, lru_cache
@@ -79,15 +79,7 @@ USERNAME_ERROR = "Username must be 6-30 characters, include at least one letter,
 
 @lru_cache(maxsize=1)
 def get_allergen_options():
-    available = set()
-    with open(MENU_CSV, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            raw = (row.get("allergens") or "").strip()
-            for part in re.split(r"[,;|/]+", raw):
-                token = part.strip().lower()
-                if token and token not in {"none", "nan"}:
-                    available.add(token)
+    available = set(get_handler().get_available_allergens())
 
     options = []
     for key in ALLERGEN_ORDER:
@@ -271,11 +263,13 @@ def _get_hc_explorer_data(center_id, hc, cl, menu, rev, stalls):
         ]
     stall_ids = hc_stalls['stall_id'].tolist()
 
-    # Reviews & ratings
+    # Reviews & ratings: one per-stall sum/count pass feeds both the centre average and the top stalls
     hc_reviews = rev[rev['stall_id'].isin(stall_ids)]
+    rating_agg = hc_reviews.groupby('stall_id')['rating'].agg(['sum', 'count'])
+    n_rated = int(rating_agg['count'].sum())
     avg_rating = (
-        round(float(hc_reviews['rating'].mean()), 2)
-        if not hc_reviews.empty else None
+        round(float(rating_agg['sum'].sum() / n_rated), 2)
+        if n_rated else None
     )
 
     # Menu & price
@@ -336,8 +330,8 @@ def _get_hc_explorer_data(center_id, hc, cl, menu, rev, stalls):
         cl_row = cl[cl['center_id'] == center_id]
     if cl_row.empty:
         cname = str(centre_info.get('center_name', '')).split('(')[0].strip().lower()
-        cl['_nc'] = cl['name'].astype(str).str.split('(').str[0].str.strip().str.lower()
-        cl_row = cl[cl['_nc'] == cname]
+        names = cl['name'].astype(str).str.split('(').str[0].str.strip().str.lower()
+        cl_row = cl[names == cname]
     if not cl_row.empty:
         row = cl_row.iloc[0]
         for q_num, qkey in enumerate(['q1', 'q2', 'q3', 'q4'], start=1):
@@ -345,28 +339,26 @@ def _get_hc_explorer_data(center_id, hc, cl, menu, rev, stalls):
 
     # Top stalls
     top_stalls = []
-    if not hc_reviews.empty:
+    if not rating_agg.empty:
         stall_avg = (
-            hc_reviews.groupby('stall_id')['rating']
-                .mean().round(2).reset_index()
-                .rename(columns={'rating': 'avg_rating'})
+            (rating_agg['sum'] / rating_agg['count'])
+                .round(2).rename('avg_rating').reset_index()
         )
         top8 = (
-            stall_avg.merge(hc_stalls[['stall_id', 'stall_name']], on='stall_id')
+            stall_avg.merge(hc_stalls[['stall_id', 'stall_name']], on='stall_id', validate='1:1')
                 .nlargest(8, 'avg_rating')
         )
         top_stalls = [
-            {'name': str(r['stall_name']), 'rating': round(float(r['avg_rating']), 2)}
-            for _, r in top8.iterrows()
+            {'name': str(r.stall_name), 'rating': round(float(r.avg_rating), 2)}
+            for r in top8.itertuples(index=False)
         ]
 
     # Price range distribution
     if not hc_menu.empty:
         bins = [0, 3, 5, 8, 10, 15, float('inf')]
         labels = ['<$3', '$3-5', '$5-8', '$8-10', '$10-15', '>$15']
-        hc_menu = hc_menu.copy()
-        hc_menu['price_band'] = pd.cut(hc_menu['price'], bins=bins, labels=labels, right=True)
-        band_counts = hc_menu['price_band'].value_counts().reindex(labels, fill_value=0)
+        price_band = pd.cut(hc_menu['price'], bins=bins, labels=labels, right=True)
+        band_counts = price_band.value_counts().reindex(labels, fill_value=0)
         hc_price_range_labels = labels
         hc_price_range_counts = [int(v) for v in band_counts.values]
     else:
@@ -397,14 +389,28 @@ def _get_hc_explorer_data(center_id, hc, cl, menu, rev, stalls):
 
 # ── Dashboard ─────────────────────────────────────────────────────────────────
 
-@app.route("/dashboard")
-@login_required
-def dashboard():
+@lru_cache(maxsize=1)
+def _load_dashboard_frames():
+    """
+    Read the dashboard CSVs once per process; callers must treat the frames as read-only.
+    Only the columns the dashboard uses are kept, so the cached frames stay small.
+    """
+    stall_cols = {'stall_id', 'stall_name', 'cuisine_type', 'hawker_center_id', 'latitude_hc', 'longitude_hc'}
     hc     = pd.read_csv(CENTRES_CSV)
     cl     = _load_closures_csv()
-    menu   = pd.read_csv(MENU_CSV)
-    rev    = pd.read_csv(REVIEWS_CSV)
-    stalls = pd.read_csv(STALLS_CSV)
+    menu   = pd.read_csv(MENU_CSV, usecols=['stall_id', 'price'])
+    rev    = pd.read_csv(REVIEWS_CSV, usecols=['stall_id', 'rating'])
+    stalls = pd.read_csv(STALLS_CSV, usecols=lambda c: c in stall_cols)
+    return hc, cl, menu, rev, stalls
+
+
+@lru_cache(maxsize=1)
+def _dashboard_base_stats():
+    """
+    Stat cards, charts and the centre dropdown for the dashboard. None of these depend on the
+    request, so they are computed once and reused.
+    """
+    hc, cl, menu, rev, stalls = _load_dashboard_frames()
 
     food_stalls = stalls[~stalls['cuisine_type'].isin(MARKET_TYPES)]
 
@@ -416,9 +422,10 @@ def dashboard():
     total_reviews = len(rev)
 
     # ── Bar: avg price per hawker centre (top 10) ───────────────────
-    menu_stalls = menu.merge(stalls[['stall_id', 'hawker_center_id']], on='stall_id')
+    menu_stalls = menu.merge(stalls[['stall_id', 'hawker_center_id']], on='stall_id', how='inner', validate='m:1')
     menu_hc = menu_stalls.merge(
-        hc[['center_id', 'center_name']], left_on='hawker_center_id', right_on='center_id'
+        hc[['center_id', 'center_name']].rename(columns={'center_id': 'hawker_center_id'}),
+        on='hawker_center_id', how='inner', validate='m:1',
     )
     price_by_centre = (
         menu_hc.groupby('center_name')['price']
@@ -437,13 +444,10 @@ def dashboard():
     quarter_cols   = ['q1_cleaningstartdate', 'q2_cleaningstartdate',
                       'q3_cleaningstartdate', 'q4_cleaningstartdate']
     nil_set = {'TBC', 'NIL', 'NA', 'NAN', 'NONE', '', 'NAT'}
-    closure_counts = []
-    for col in quarter_cols:
-        if col in cl.columns:
-            valid = cl[col].fillna('').str.strip().str.upper().apply(lambda v: v not in nil_set)
-            closure_counts.append(int(valid.sum()))
-        else:
-            closure_counts.append(0)
+    closure_counts = [
+        int((~cl[col].fillna('').str.strip().str.upper().isin(nil_set)).sum()) if col in cl.columns else 0
+        for col in quarter_cols
+    ]
 
     # ── Horizontal bar: top 8 stalls by avg rating ──────────────────
     stall_avg = (
@@ -451,7 +455,7 @@ def dashboard():
             .reset_index().rename(columns={'rating': 'avg_rating'})
     )
     top8 = (
-        stall_avg.merge(food_stalls[['stall_id', 'stall_name']], on='stall_id')
+        stall_avg.merge(food_stalls[['stall_id', 'stall_name']], on='stall_id', validate='1:1')
             .nlargest(8, 'avg_rating')[['stall_name', 'avg_rating']]
     )
     stall_names  = top8['stall_name'].tolist()
@@ -464,6 +468,29 @@ def dashboard():
             .to_dict(orient='records')
     )
 
+    return {
+        'total_stalls': f"{total_stalls:,}",
+        'total_centres': total_centres,
+        'avg_rating': avg_rating,
+        'total_reviews': f"{total_reviews:,}",
+        'avg_price': avg_price,
+        'price_labels': price_labels,
+        'price_values': price_values,
+        'cuisine_labels': cuisine_labels,
+        'cuisine_counts': cuisine_counts,
+        'trend_months': quarter_labels,
+        'trend_scores': closure_counts,
+        'top_stall_names': stall_names,
+        'top_stall_scores': stall_scores,
+        'all_centres': all_centres,
+    }
+
+
+@app.route("/dashboard")
+@login_required
+def dashboard():
+    hc, cl, menu, rev, stalls = _load_dashboard_frames()
+
     # ── HC Explorer: resolve selected centre from ?center_id= ────────
     hc_data = {}
     selected_center_id = request.args.get('center_id', type=int)
@@ -479,21 +506,8 @@ def dashboard():
         "dashboard.html",
         username=session["username"],
         active_page="dashboard",
-        total_stalls=f"{total_stalls:,}",
-        total_centres=total_centres,
-        avg_rating=avg_rating,
-        total_reviews=f"{total_reviews:,}",
-        avg_price=avg_price,
-        price_labels=price_labels,
-        price_values=price_values,
-        cuisine_labels=cuisine_labels,
-        cuisine_counts=cuisine_counts,
-        trend_months=quarter_labels,
-        trend_scores=closure_counts,
-        top_stall_names=stall_names,
-        top_stall_scores=stall_scores,
-        all_centres=all_centres,
         wherecrowded_url=wherecrowded_url,
+        **_dashboard_base_stats(),
         **hc_data,
     )
 
@@ -509,11 +523,11 @@ def cuisines():
     selected_allergens = normalize_allergen_values(request.args.getlist('allergens'))  # e.g. ['gluten', 'dairy']
     max_price = request.args.get('max_price', 15, type=float)  # slider: $1–$15, default = show all
 
-    handler = CuisineFeatureHandler()
+    handler = get_handler()
     profile = da.get_profile(session["username"])
 
     stalls_df = handler._stall_base()
-    stalls_df = stalls_df.merge(handler._get_review_scores(), on='stall_id', how='left')
+    stalls_df = stalls_df.merge(handler._get_review_scores(), on='stall_id', how='left', validate='m:1')
     stalls_df = stalls_df.drop(columns=['average_rating'], errors='ignore')
     stalls_df['n_reviews'] = stalls_df['n_reviews'].fillna(0).astype(int)
     stalls_df['avg_rating'] = stalls_df['avg_rating'].fillna(0.0)
@@ -527,10 +541,8 @@ def cuisines():
         coords = (float(profile.location_lat), float(profile.location_lng))
 
     if coords and {"latitude_hc", "longitude_hc"}.issubset(stalls_df.columns):
-        stalls_df["distance_km"] = stalls_df.apply(
-            lambda r: haversine_km(coords[0], coords[1], float(r["latitude_hc"]), float(r["longitude_hc"]))
-            if pd.notna(r["latitude_hc"]) and pd.notna(r["longitude_hc"]) else None,
-            axis=1,
+        stalls_df["distance_km"] = haversine_km_array(
+            coords[0], coords[1], stalls_df["latitude_hc"], stalls_df["longitude_hc"]
         )
     else:
         stalls_df["distance_km"] = None
@@ -548,7 +560,8 @@ def cuisines():
     # Build the default stall pool, hoisting onboarding-preferred cuisines to the top
     # when no explicit cuisine filter has been selected by the user.
     if not selected_cuisine and onboarding_cuisines:
-        preferred_mask = stalls_df['cuisine_type'].str.lower().isin(onboarding_cuisines)
+        cuisine_lc = stalls_df['cuisine_type'].str.lower()
+        preferred_mask = cuisine_lc.isin(onboarding_cuisines)
         other_df = (
             stalls_df[~preferred_mask]
             .sort_values('bayes_score', ascending=False)
@@ -557,7 +570,7 @@ def cuisines():
         # Build a per-cuisine list sorted by score, then round-robin interleave
         # so all chosen cuisines appear evenly rather than one dominating.
         cuisine_buckets = [
-            stalls_df[stalls_df['cuisine_type'].str.lower() == c]
+            stalls_df[cuisine_lc == c]
                 .sort_values('bayes_score', ascending=False)
                 .to_dict(orient='records')
             for c in onboarding_cuisines
@@ -573,76 +586,72 @@ def cuisines():
         filler_records = other_df.to_dict(orient='records')
         varied = pd.DataFrame(interleaved + filler_records)
     else:
-        per_cuisine = (
-            stalls_df.groupby('cuisine_type', group_keys=False)
-                     .apply(lambda g: g.sample(min(len(g), 1), random_state=42))
-        )
+        # One stall per cuisine. g.sample(1, random_state=42) depends only on the group size,
+        # so pick the same row straight from the group positions instead of groupby.apply
+        groups = stalls_df.groupby('cuisine_type', observed=True).indices
+        picks = [
+            groups[c][np.random.RandomState(42).choice(len(groups[c]), 1, replace=False)[0]]
+            for c in sorted(groups)
+        ]
+        per_cuisine = stalls_df.iloc[picks]
         remaining = (
             stalls_df[~stalls_df['stall_id'].isin(per_cuisine['stall_id'])]
             .sort_values('bayes_score', ascending=False)
         )
         varied = pd.concat([per_cuisine, remaining]).sample(frac=1, random_state=42)
 
-    stalls_list = varied.to_dict(orient='records')
+    if varied.empty:
+        varied = stalls_df.iloc[:0]
+
+    # Build every filter as a boolean mask over the pool and slice once at the end
+    keep = np.ones(len(varied), dtype=bool)
 
     # Filter by cuisine
     if selected_cuisine:
-        stalls_list = [
-            s for s in stalls_list
-            if selected_cuisine in s.get('cuisine_type', '').lower()
-        ]
+        keep &= (
+            varied['cuisine_type'].str.lower()
+            .str.contains(selected_cuisine, regex=False, na=False)
+            .to_numpy(dtype=bool)
+        )
 
     # Filter by stars
     if selected_stars:
         _min = float(selected_stars)
         _max = _min + 1.0
-        stalls_list = [
-            s for s in stalls_list
-            if _min <= s.get('avg_rating', 0) < _max
-               and s.get('n_reviews', 0) >= 5
-        ]
+        rating = varied['avg_rating'].to_numpy(dtype=float)
+        keep &= (_min <= rating) & (rating < _max) & (varied['n_reviews'].to_numpy() >= 5)
 
     # Filter by search query (stall name or hawker centre name)
     if search_query:
-        stalls_list = [
-            s for s in stalls_list
-            if search_query in s.get('stall_name', '').lower()
-               or search_query in s.get('hawker_name', '').lower()
-        ]
+        def name_hits(col):
+            if col not in varied.columns:
+                return np.zeros(len(varied), dtype=bool)
+            return varied[col].str.lower().str.contains(search_query, regex=False, na=False).to_numpy(dtype=bool)
+
+        keep &= name_hits('stall_name') | name_hits('hawker_name')
 
     # Filter by allergens - exclude stalls that contain any selected allergen
-    # Expects each stall record to have an 'allergens' field: a list of strings
-    # e.g. ['gluten', 'shellfish']
+    # Each stall's 'allergens' field is a delimited string, e.g. 'gluten, shellfish'
     if selected_allergens:
-        def stall_is_safe(stall):
-            raw = stall.get('allergens', '')
-            if isinstance(raw, list):
-                stall_allergens = [a.lower().strip() for a in raw]
-            else:
-                stall_allergens = [a.lower().strip() for a in re.split(r'[,;|/]+', str(raw)) if a.strip()]
-            stall_allergens = normalize_allergen_values(stall_allergens)
-            return not any(a in stall_allergens for a in selected_allergens)
-
-        stalls_list = [s for s in stalls_list if stall_is_safe(s)]
+        # one token regex (aliases included) instead of splitting every stall's list
+        pattern = handler._allergen_pattern(selected_allergens)
+        if pattern and 'allergens' in varied.columns:
+            keep &= ~(
+                varied['allergens']
+                .str.contains(pattern, case=False, regex=True, na=False)
+                .to_numpy(dtype=bool)
+            )
 
     # Filter by max price
     if max_price is not None:
         menu_df = handler.merged_df
 
-        # Build stall_id -> min_price map
-        menu_df = handler.merged_df.copy()
-        menu_df['price'] = pd.to_numeric(menu_df['price'], errors='coerce')
+        # Build stall_id -> min_price map (no need to copy merged_df just to coerce prices)
+        min_price = pd.to_numeric(menu_df['price'], errors='coerce').groupby(menu_df['stall_id']).min()
+        keep &= (varied['stall_id'].map(min_price).fillna(float('inf')) <= max_price).to_numpy(dtype=bool)
 
-        min_price_map = (
-            menu_df.groupby('stall_id')['price']
-            .min()
-            .to_dict()
-        )
+    stalls_list = varied[keep].to_dict(orient='records')
 
-        stalls_list = [
-            s for s in stalls_list
-            if min_price_map.get(s['stall_id'], float('inf')) <= max_price
-        ]
     # Sort — when onboarding cuisines drive the default view and no explicit
     # sort is requested, preserve the round-robin interleaved order as-is.
     using_onboarding_order = (not selected_cuisine and bool(onboarding_cuisines)
@@ -693,12 +702,12 @@ def pricing():
         return render_template("feature_pricing.html",
                                stall=None, menu_items=[], error="No stall selected.")
 
-    handler = CuisineFeatureHandler()
+    handler = get_handler()
 
     # Stall header info
     stall_base = handler._stall_base()
     scores = handler._get_review_scores()
-    stall_row = stall_base.merge(scores, on='stall_id', how='left')
+    stall_row = stall_base.merge(scores, on='stall_id', how='left', validate='m:1')
     stall_row = stall_row[stall_row['stall_id'] == stall_id]
 
     if stall_row.empty:
@@ -713,9 +722,12 @@ def pricing():
     stall['n_reviews']  = int(stall.get('n_reviews',  0) or 0)
     stall['avg_rating'] = float(stall.get('avg_rating', 0.0) or 0.0)
 
-    # Menu items for this stall
+    # Allergens the user wants to avoid
+    blocked_allergens = normalize_allergen_values(request.args.getlist('allergens'))
+
+    # Menu items for this stall, minus anything containing a blocked allergen
     try:
-        menu_df = handler.get_menu_for_stall(stall_id)
+        menu_df = handler.get_menu_for_stall(stall_id, CuisinePreferences(allergens_to_avoid=blocked_allergens))
     except Exception:
         menu_df = pd.DataFrame()
 
@@ -735,14 +747,11 @@ def pricing():
             return []
         return normalize_allergen_values([a.strip() for a in re.split(r'[,;|/]+', s) if a.strip()])
 
-    # Allergens the user wants to avoid
-    blocked_allergens = normalize_allergen_values(request.args.getlist('allergens'))
-
     # Max price cap forwarded from the cuisines filters
     max_price = request.args.get('max_price', 15, type=float)
 
     menu_items = []
-    for _, row in menu_df.iterrows():
+    for row in menu_df.to_dict(orient="records"):
         price_raw = row.get('price')
         try:
             price = float(price_raw) if pd.notna(price_raw) else None
@@ -751,10 +760,6 @@ def pricing():
 
         item_allergens = _parse_allergens(row.get('allergens', ''))
 
-        # Skip this item if it contains any allergen the user is avoiding
-        if blocked_allergens and any(a in item_allergens for a in blocked_allergens):
-            continue
-
         # Skip this item if its price exceeds the user's max price
         if price is not None and max_price < 15 and price > max_price:
             continue
@@ -985,7 +990,7 @@ def itinerary():
     saved_ids = da.get_saved_stalls(session["username"])
 
     # Resolve stall details
-    handler = CuisineFeatureHandler()
+    handler = get_handler()
     itinerary_list = []
     if saved_ids:
         coords = None
@@ -1016,8 +1021,7 @@ def itinerary():
         stalls_df['_order'] = stalls_df['stall_id'].map(id_order)
         stalls_df = stalls_df.sort_values('_order').drop(columns=['_order'])
 
-        for _, row in stalls_df.iterrows():
-            d = row.to_dict()
+        for d in stalls_df.to_dict(orient='records'):
             d = {k: (None if isinstance(v, float) and pd.isna(v) else v) for k, v in d.items()}
             d['n_reviews'] = int(d.get('n_reviews', 0) or 0)
             d['avg_rating'] = float(d.get('avg_rating', 0.0) or 0.0)
@@ -1112,7 +1116,7 @@ def itinerary_optimise(day_index):
         return redirect(url_for("itinerary"))
 
     saved_ids = da.get_saved_stalls(session["username"])
-    handler = CuisineFeatureHandler()
+    handler = get_handler()
     trip_start = profile.trip_start if profile else None
     trip_end = profile.trip_end if profile else None
 
@@ -1178,12 +1182,12 @@ def itinerary_reorder(day_index, stall_id, direction):
         order[idx], order[idx + 1] = order[idx + 1], order[idx]
 
     # Recalculate leg distances using the same OneMap routing as the optimiser
-    handler = CuisineFeatureHandler()
+    handler = get_handler()
     all_ids = [s["stall_id"] for s in order]
     stalls_df = handler.get_stalls_by_ids(all_ids, coords=None, radius_km=999)
     coord_map = {}
     if not stalls_df.empty:
-        for _, row in stalls_df.iterrows():
+        for row in stalls_df.to_dict(orient="records"):
             sid = int(row["stall_id"])
             lat = row.get("latitude_hc")
             lng = row.get("longitude_hc")
@@ -1247,7 +1251,7 @@ def itinerary_export():
     """Simple plain-text export of saved stalls."""
     profile = da.get_profile(session["username"])
     saved_ids = da.get_saved_stalls(session["username"])
-    handler = CuisineFeatureHandler()
+    handler = get_handler()
     stall_day_map = da.get_stall_day_map(session["username"])
     route_orders = da.get_route_orders(session["username"])
 
@@ -1257,13 +1261,9 @@ def itinerary_export():
     lines.append("")
 
     if saved_ids:
+        # get_stalls_by_ids already carries n_reviews / avg_rating / bayes_score
         stalls_df = handler.get_stalls_by_ids(saved_ids, coords=None, radius_km=50)
-        scores_df = handler._get_review_scores()
-        if not stalls_df.empty and not scores_df.empty:
-            stalls_df = stalls_df.merge(scores_df, on='stall_id', how='left')
-        stall_lookup = {}
-        for _, row in stalls_df.iterrows():
-            stall_lookup[int(row["stall_id"])] = row
+        stall_lookup = {int(row["stall_id"]): row for row in stalls_df.to_dict(orient="records")}
 
         if profile and profile.trip_start and profile.trip_end:
             start_dt = datetime.strptime(profile.trip_start, "%d/%m/%Y")
@@ -1364,8 +1364,7 @@ def reviews():
 
     if stall_id:
         # Get stall name + hawker centre name
-        from feature_cuisines import CuisineFeatureHandler
-        handler = CuisineFeatureHandler()
+        handler = get_handler()
         stall_row = handler._stall_base()
         stall_row = stall_row[stall_row["stall_id"] == stall_id]
         if not stall_row.empty:
@@ -1555,10 +1554,12 @@ def reviews_search():
     try:
         matches = review_feature.search_stalls(q, limit=8)
         hc = pd.read_csv(CENTRES_CSV)[["center_id", "center_name"]]
-        merged = matches.merge(hc, left_on="hawker_center_id", right_on="center_id", how="left")
+        merged = matches.merge(
+            hc.rename(columns={"center_id": "hawker_center_id"}), on="hawker_center_id", how="left", validate="m:1"
+        )
         results = []
         seen = set()
-        for _, row in merged.iterrows():
+        for row in merged.to_dict(orient="records"):
             stall_id = int(row["stall_id"])
             stall_name = str(row["stall_name"])
             hawker_name = str(row.get("center_name", "") or "")
@@ -1735,12 +1736,12 @@ def preferences():
     saved_ids = da.get_saved_stalls(session["username"])
     saved_stall_rows = []
     if saved_ids:
-        handler = CuisineFeatureHandler()
+        handler = get_handler()
         stalls_df = handler.get_stalls_by_ids(saved_ids, coords=None, radius_km=999)
         id_order = {sid: index for index, sid in enumerate(saved_ids)}
         stalls_df["_saved_order"] = stalls_df["stall_id"].map(id_order)
         stalls_df = stalls_df.sort_values("_saved_order")
-        for _, row in stalls_df.head(8).iterrows():
+        for row in stalls_df.head(8).to_dict(orient="records"):
             saved_stall_rows.append({
                 "stall_id": int(row.get("stall_id")),
                 "stall_name": str(row.get("stall_name", "")),
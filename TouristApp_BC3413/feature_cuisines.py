@@ -3,14 +3,22 @@ from __future__ import annotations
 import os
 import re
 import sqlite3
+import tempfile
 from dataclasses import dataclass
+from functools import lru_cache
 # removing tuple
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow  # type: ignore  # parquet engine for the warm-start cache
+except ModuleNotFoundError:
+    pyarrow = None  # type: ignore
+
 from feature_onboarding import DB_FILE
-from features_location import Coord, haversine_km
+from features_location import Coord, haversine_km_array
 
 ALLERGEN_ALIASES = {
     "eggs": ["egg"],
@@ -27,6 +35,30 @@ ALLERGEN_ALIASES = {
     "pork": ["pork"],
 }
 
+# low-cardinality stall columns, stored as category on stalls_df and carried into merged_df by the join
+CATEGORY_COLUMNS = ["cuisine_type"]
+
+# only the columns the app reads; missing ones are simply skipped by usecols
+MENU_COLUMNS = {"stall_id", "item_name", "price", "allergens", "description"}
+STALL_COLUMNS = {"stall_id", "stall_name", "cuisine_type", "hawker_center_id", "allergens"}
+REVIEW_COLUMNS = {"stall_id", "rating"}
+# free text goes into Arrow-backed strings (contiguous buffers, vectorised .str kernels) when pyarrow is installed
+TEXT_DTYPE = "string[pyarrow]" if pyarrow is not None else str
+CSV_DTYPES = {
+    "stall_id": "int32",  # join key; a few thousand stalls fit easily and halve the bytes hashed
+    "item_name": TEXT_DTYPE,
+    "allergens": TEXT_DTYPE,
+    "description": TEXT_DTYPE,
+    "stall_name": TEXT_DTYPE,
+    # cuisine_type is left to the category cast: the pyarrow engine reads blank cells as 'None' under dtype=str
+}
+# integer ids whose width isn't known up front; to_numeric(downcast=) leaves them alone if they hold NaN.
+# price and rating stay float64 since they are compared against user-entered thresholds
+DOWNCAST_INT_COLUMNS = ["hawker_center_id"]
+
+# bump whenever the shape/dtypes of the cached frames change so old parquet files are ignored
+CACHE_VERSION = 6
+
 def normalize_allergen_values(values: List[str]) -> List[str]:
     normalized: List[str] = []
     for value in values:
@@ -38,6 +70,104 @@ def normalize_allergen_values(values: List[str]) -> List[str]:
                 normalized.append(expanded)
     return normalized
 
+def _read_csv(path: str, columns: set) -> pd.DataFrame:
+    if pyarrow is None:
+        return pd.read_csv(path, usecols=lambda c: c in columns, dtype=CSV_DTYPES)
+    # pyarrow's multithreaded parser wants usecols/dtype as plain lists of existing columns
+    header = [c for c in pd.read_csv(path, nrows=0).columns if c in columns]
+    return pd.read_csv(path, engine="pyarrow", usecols=header, dtype={c: CSV_DTYPES[c] for c in header if c in CSV_DTYPES})
+
+def _downcast_ints(df: pd.DataFrame, columns: List[str]) -> None:
+    for col in columns:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+
+def _read_cache(paths: List[str], stamp_path: str, stamp: str) -> Optional[List[pd.DataFrame]]:
+    # parquet frames written by _write_cache, only if their stamp still matches the source CSVs
+    if pyarrow is None or not all(os.path.exists(p) for p in paths + [stamp_path]):
+        return None
+    try:
+        with open(stamp_path, encoding="utf-8") as f:
+            if f.read().strip() == stamp:
+                return [pd.read_parquet(p) for p in paths]
+    except Exception:
+        pass
+    return None
+
+def _write_cache(frames: List[pd.DataFrame], paths: List[str], stamp_path: str, stamp: str) -> None:
+    if pyarrow is None:
+        return
+    # best effort: a read-only dataset folder just means no warm-start cache.
+    # Every file goes to a unique temp file and is swapped in with os.replace, stamp last, so a crash or
+    # another worker warming up at the same time never leaves a matching stamp next to a partial parquet
+    tmp_paths: List[str] = []
+    try:
+        if os.path.exists(stamp_path):
+            os.remove(stamp_path)
+        for frame, path in zip(frames, paths):
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".parquet")  # matches .gitignore
+            os.close(fd)
+            tmp_paths.append(tmp_path)
+            frame.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(stamp_path), prefix=".", suffix=".stamp", delete=False) as f:
+            tmp_paths.append(f.name)
+            f.write(stamp)
+        os.replace(f.name, stamp_path)
+    except Exception:
+        for tmp_path in tmp_paths:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+@lru_cache(maxsize=4)
+def _load_merged(menu_path: str, stalls_path: str, menu_mtime: float, stalls_mtime: float) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    # mtimes are only part of the cache key so that editing either CSV busts the cache
+    cache_dir = os.path.dirname(menu_path)
+    cache_paths = [os.path.join(cache_dir, f".{name}.parquet") for name in ("menu_items", "stalls", "merged")]
+    stamp_path = os.path.join(cache_dir, ".merged.stamp")
+    stamp = f"{CACHE_VERSION}:{menu_mtime}:{stalls_mtime}"
+
+    cached = _read_cache(cache_paths, stamp_path, stamp)
+    if cached is not None:
+        menu_df, stalls_df, merged = cached
+        return menu_df, stalls_df, merged
+
+    menu_df = _read_csv(menu_path, MENU_COLUMNS)
+    stalls_df = _read_csv(stalls_path, STALL_COLUMNS)
+    _downcast_ints(stalls_df, DOWNCAST_INT_COLUMNS)
+    for col in CATEGORY_COLUMNS:
+        if col in stalls_df.columns:
+            stalls_df[col] = stalls_df[col].astype("category")
+    # stall_id is the stalls primary key: index that side once and join against it
+    merged = menu_df.join(stalls_df.set_index("stall_id"), on="stall_id", how="left", validate="many_to_one")
+
+    _write_cache([menu_df, stalls_df, merged], cache_paths, stamp_path, stamp)
+    return menu_df, stalls_df, merged
+
+@lru_cache(maxsize=4)
+def _load_review_ratings(reviews_path: str, reviews_mtime: float) -> pd.DataFrame:
+    # reviews.csv is by far the largest input, but the handler only scores stalls from it
+    cache_dir = os.path.dirname(reviews_path)
+    cache_path = os.path.join(cache_dir, ".reviews.parquet")
+    stamp_path = os.path.join(cache_dir, ".reviews.stamp")
+    stamp = f"{CACHE_VERSION}:{reviews_mtime}"
+
+    cached = _read_cache([cache_path], stamp_path, stamp)
+    if cached is not None:
+        return cached[0]
+
+    reviews_df = pd.read_csv(reviews_path, usecols=lambda c: c in REVIEW_COLUMNS)
+    if "rating" not in reviews_df.columns:
+        reviews_df["rating"] = 0
+    reviews_df["rating"] = pd.to_numeric(reviews_df["rating"], errors="coerce").fillna(0.0)
+    _downcast_ints(reviews_df, ["stall_id"])
+
+    _write_cache([reviews_df], [cache_path], stamp_path, stamp)
+    return reviews_df
+
 @dataclass
 class CuisinePreferences:
     cuisines: List[str] | None = None
@@ -58,9 +188,12 @@ class CuisineFeatureHandler:
         self.reviews_path = os.path.join(menu_dir, "reviews.csv")
         self.hc_path = os.path.join(hc_dir, "DatesofHawkerCentresClosure.csv")
 
-        self.menu_df = pd.read_csv(self.menu_path)
-        self.stalls_df = pd.read_csv(self.stalls_path)
-        self.reviews_df = pd.read_csv(self.reviews_path)
+        self.menu_df, self.stalls_df, self._menu_stalls_df = _load_merged(
+            self.menu_path,
+            self.stalls_path,
+            os.path.getmtime(self.menu_path),
+            os.path.getmtime(self.stalls_path),
+        )
         self.hc_df = pd.read_csv(self.hc_path)
 
         self.hawker_id_col = "serial_no" if "serial_no" in self.hc_df.columns else None
@@ -68,23 +201,44 @@ class CuisineFeatureHandler:
         self.lat_col = "latitude_hc" if "latitude_hc" in self.hc_df.columns else None
         self.lng_col = "longitude_hc" if "longitude_hc" in self.hc_df.columns else ("longtitude_hc" if "longtitude_hc" in self.hc_df.columns else None)
 
-        self._prepare_reviews()
-        self._build_merged_df()
-
-    def _prepare_reviews(self) -> None:
-        if "rating" not in self.reviews_df.columns:
-            self.reviews_df["rating"] = 0
-        self.reviews_df["rating"] = pd.to_numeric(self.reviews_df["rating"], errors="coerce").fillna(0.0)
+        self._cuisine_positions: Optional[Dict[object, np.ndarray]] = None
+        self._stall_positions: Optional[Dict[int, np.ndarray]] = None
+        self._available_cuisines: Optional[List[str]] = None
+        self._available_allergens: Optional[List[str]] = None
+        self._last_filter: Optional[Tuple[tuple, pd.DataFrame]] = None
+        # built on first use: the cuisine/allergen pickers only need menu_df and stalls_df
+        self._reviews_df: Optional[pd.DataFrame] = None
+        self._merged_df: Optional[pd.DataFrame] = None
+        self._allergens_lc: Optional[pd.Series] = None
+
+    @property
+    def reviews_df(self) -> pd.DataFrame:
+        if self._reviews_df is None:
+            self._reviews_df = _load_review_ratings(self.reviews_path, os.path.getmtime(self.reviews_path))
+        return self._reviews_df
+
+    @property
+    def merged_df(self) -> pd.DataFrame:
+        if self._merged_df is None:
+            self._build_merged_df()
+        return self._merged_df
+
+    def _hc_lookup(self) -> pd.DataFrame:
+        # hawker centre columns keyed by hawker_center_id, so joins can use on= without a duplicate key column
+        keep = [c for c in [self.hawker_id_col, self.hawker_name_col, self.lat_col, self.lng_col, "address_myenv", "google_3d_view", "photourl"] if c]
+        hc = self.hc_df[keep].rename(columns={self.hawker_id_col: "hawker_center_id"})
+        if self.hawker_name_col:
+            hc = hc.rename(columns={self.hawker_name_col: "hawker_name"})
+            hc["hawker_name"] = hc["hawker_name"].astype("category")
+        return hc
 
     def _build_merged_df(self) -> None:
-        df = self.menu_df.merge(self.stalls_df, on="stall_id", how="left")
+        df = self._menu_stalls_df
         if self.hawker_id_col and "hawker_center_id" in df.columns:
-            keep = [c for c in [self.hawker_id_col, self.hawker_name_col, self.lat_col, self.lng_col, "address_myenv", "google_3d_view", "photourl"] if c]
-            hc = self.hc_df[keep].copy()
-            df = df.merge(hc, left_on="hawker_center_id", right_on=self.hawker_id_col, how="left")
-            if self.hawker_name_col and self.hawker_name_col in df.columns:
-                df = df.rename(columns={self.hawker_name_col: "hawker_name"})
-        self.merged_df = df
+            df = df.merge(self._hc_lookup(), on="hawker_center_id", how="left", validate="many_to_one")
+        # lower-cased once so allergen scans can match case-sensitively
+        self._allergens_lc = df["allergens"].str.lower() if "allergens" in df.columns else None
+        self._merged_df = df
 
     @staticmethod
     def _split_cell(cell: object) -> List[str]:
@@ -98,11 +252,26 @@ class CuisineFeatureHandler:
     def get_available_cuisines(self) -> List[str]:
         if "cuisine_type" not in self.stalls_df.columns:
             return []
-        tokens = set()
-        for value in self.stalls_df["cuisine_type"].dropna().astype(str):
-            for token in self._split_cell(value):
-                tokens.add(token.title())
-        return sorted(tokens - self.EXCLUDE_CUISINES)
+        # stalls_df never changes after load, so the sorted list is computed once per handler
+        if self._available_cuisines is None:
+            tokens = set()
+            # split each distinct cuisine string once rather than once per stall
+            for value in self.stalls_df["cuisine_type"].dropna().astype(str).unique():
+                for token in self._split_cell(value):
+                    tokens.add(token.title())
+            self._available_cuisines = sorted(tokens - self.EXCLUDE_CUISINES)
+        return list(self._available_cuisines)
+
+    def get_available_allergens(self) -> List[str]:
+        if "allergens" not in self.menu_df.columns:
+            return []
+        if self._available_allergens is None:
+            # raw cells, so literal "NA"/"N/A" allergens stay options instead of becoming NaN as they do in menu_df
+            raw = pd.read_csv(self.menu_path, usecols=["allergens"], dtype=str, keep_default_na=False)["allergens"]
+            # one split/explode over the column instead of splitting cell by cell in Python
+            tokens = raw.str.lower().str.split(r"[,;/|]+", regex=True).explode().str.strip()
+            self._available_allergens = sorted(set(tokens[(tokens != "") & ~tokens.isin({"none", "nan"})].dropna().unique()))
+        return list(self._available_allergens)
 
 
     def save_preferences(self, prefs: CuisinePreferences, username: str) -> None:
@@ -142,17 +311,90 @@ class CuisineFeatureHandler:
         agg["bayes_score"] = (m * global_mean + agg["n_reviews"] * agg["avg_rating"]) / (m + agg["n_reviews"])
         return agg
 
-    def _apply_pref_filters(self, df: pd.DataFrame, prefs: CuisinePreferences) -> pd.DataFrame:
-        out = df.copy()
-        if prefs.cuisines and "cuisine_type" in out.columns:
+    @staticmethod
+    def _allergen_pattern(allergens: List[str]) -> str:
+        # raw cell tokens that expand (via ALLERGEN_ALIASES) to any blocked allergen,
+        # matched as whole tokens of the same separators _split_cell uses
+        blocked = set(normalize_allergen_values(allergens))
+        if not blocked:
+            return ""
+        tokens = {t for t, expanded in ALLERGEN_ALIASES.items() if blocked.intersection(expanded)}
+        tokens |= {b for b in blocked if b not in ALLERGEN_ALIASES}
+        alternation = "|".join(sorted(re.escape(t) for t in tokens))
+        return rf"(?:^|[,;/|])\s*(?:{alternation})\s*(?:[,;/|]|$)"
+
+    @staticmethod
+    def _match_values(col: pd.Series, predicate) -> np.ndarray:
+        # categorical columns: evaluate the predicate once per category, then gather by code
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            labels = [str(c).lower() for c in col.cat.categories] + ["nan"]
+            hits = np.fromiter((predicate(x) for x in labels), dtype=bool, count=len(labels))
+            return hits[col.cat.codes.to_numpy()]  # code -1 (missing) picks the trailing "nan"
+        return col.astype(str).str.lower().apply(predicate).to_numpy(dtype=bool)
+
+    def _allergens_lower(self, df: pd.DataFrame) -> pd.Series:
+        # slices of merged_df keep its index, so the pre-lowered column can be picked by label
+        merged = self.merged_df
+        if self._allergens_lc is None:
+            return df["allergens"].str.lower()
+        if df is merged:
+            return self._allergens_lc
+        return self._allergens_lc.loc[df.index]
+
+    def _pref_mask(self, df: pd.DataFrame, prefs: CuisinePreferences) -> np.ndarray:
+        # one boolean mask for all active filters so we only slice the frame once
+        mask = np.ones(len(df), dtype=bool)
+        if prefs.cuisines and "cuisine_type" in df.columns:
             wanted = [c.lower() for c in prefs.cuisines]
-            out = out[out["cuisine_type"].astype(str).str.lower().apply(lambda x: any(w in x for w in wanted))]
-        if prefs.allergens_to_avoid and "allergens" in out.columns:
-            blocked = normalize_allergen_values(prefs.allergens_to_avoid)
-            out = out[~out["allergens"].astype(str).str.lower().apply(
-                lambda x: any(b in normalize_allergen_values(self._split_cell(x)) for b in blocked)
-            )]
-        return out
+            mask &= self._match_values(df["cuisine_type"], lambda x: any(w in x for w in wanted))
+        if prefs.allergens_to_avoid and "allergens" in df.columns:
+            pattern = self._allergen_pattern(prefs.allergens_to_avoid)
+            rows = np.flatnonzero(mask)
+            if pattern and len(rows):
+                # only rows the cuisine filter kept, and each distinct allergen string once (code -1 = missing)
+                codes, uniques = pd.factorize(self._allergens_lower(df).iloc[rows])
+                blocked = pd.Series(uniques, dtype=object).str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)
+                mask[rows] = ~np.append(blocked, False)[codes]
+        return mask
+
+    def _cuisine_rows(self, wanted: List[str]) -> np.ndarray:
+        # row positions of merged_df per cuisine value, built once and reused by every cuisine filter
+        if self._cuisine_positions is None:
+            col = self.merged_df["cuisine_type"]
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                # group on the codes: a categorical groupby drops the missing (-1) group even with dropna=False,
+                # and missing cuisines must still match as "nan" like they do in _match_values
+                codes = col.cat.codes.to_numpy()
+                labels = list(col.cat.categories) + [np.nan]
+                by_code = pd.Series(codes).groupby(codes, sort=False).indices
+                self._cuisine_positions = {labels[code]: pos for code, pos in by_code.items()}
+            else:
+                self._cuisine_positions = col.groupby(col, sort=False, dropna=False).indices
+        hits = [pos for cuisine, pos in self._cuisine_positions.items() if any(w in str(cuisine).lower() for w in wanted)]
+        return np.sort(np.concatenate(hits)) if hits else np.empty(0, dtype=np.intp)
+
+    def _stall_rows(self, stall_ids: List[int]) -> np.ndarray:
+        # same idea as _cuisine_rows, keyed by stall_id for the per-stall menu lookups
+        if self._stall_positions is None:
+            self._stall_positions = self.merged_df.groupby("stall_id", sort=False).indices
+        hits = [self._stall_positions[i] for i in stall_ids if i in self._stall_positions]
+        return np.sort(np.concatenate(hits)) if hits else np.empty(0, dtype=np.intp)
+
+    def _offers_any_cuisine(self, wanted: List[str]) -> bool:
+        # checked against the distinct stall cuisines only; "nan" stands in for missing values as in _match_values
+        col = self.stalls_df["cuisine_type"]
+        values = col.cat.categories if isinstance(col.dtype, pd.CategoricalDtype) else col.dropna().unique()
+        labels = [str(v).lower() for v in values] + ["nan"]
+        return any(w in x for x in labels for w in wanted)
+
+    def _apply_pref_filters(self, df: pd.DataFrame, prefs: CuisinePreferences) -> pd.DataFrame:
+        if prefs.cuisines and "cuisine_type" in self.stalls_df.columns:
+            if not self._offers_any_cuisine([c.lower() for c in prefs.cuisines]):
+                return df.iloc[:0]
+        if df is self.merged_df and prefs.cuisines and "cuisine_type" in df.columns:
+            df = df.iloc[self._cuisine_rows([c.lower() for c in prefs.cuisines])]
+            prefs = CuisinePreferences(allergens_to_avoid=prefs.allergens_to_avoid)
+        return df.loc[self._pref_mask(df, prefs)]
 
     def _get_open_hawker_ids(self, trip_start: str | None, trip_end: str | None) -> set:
         if not trip_start or not trip_end or not self.hawker_id_col:
@@ -176,42 +418,50 @@ class CuisineFeatureHandler:
         open_ids = self._get_open_hawker_ids(trip_start, trip_end)
         if not open_ids:
             return df
-        out = df.copy()
-        out["hawker_center_id"] = pd.to_numeric(out["hawker_center_id"], errors="coerce")
-        return out[out["hawker_center_id"].isin(open_ids)].copy()
+        ids = pd.to_numeric(df["hawker_center_id"], errors="coerce")
+        keep = ids.isin(open_ids)
+        out = df.loc[keep].copy()
+        out["hawker_center_id"] = ids[keep]
+        return out
 
     def _stall_base(self) -> pd.DataFrame:
-        base = self.stalls_df.copy()
+        base = self.stalls_df
         if self.hawker_id_col and "hawker_center_id" in base.columns:
-            keep = [c for c in [self.hawker_id_col, self.hawker_name_col, self.lat_col, self.lng_col, "address_myenv", "google_3d_view", "photourl"] if c]
-            hc = self.hc_df[keep].copy()
-            base = base.merge(hc, left_on="hawker_center_id", right_on=self.hawker_id_col, how="left")
-            if self.hawker_name_col and self.hawker_name_col in base.columns:
-                base = base.rename(columns={self.hawker_name_col: "hawker_name"})
-        return base
+            return base.merge(self._hc_lookup(), on="hawker_center_id", how="left", validate="many_to_one")
+        return base.copy()
 
     def _aggregate_stalls(self, filtered_menu_df: pd.DataFrame, coords: Coord | None, radius_km: float, top_n: int, m: float) -> pd.DataFrame:
         if filtered_menu_df.empty:
             return pd.DataFrame()
         base = self._stall_base()
-        out = base.merge(filtered_menu_df[["stall_id"]].drop_duplicates(), on="stall_id", how="inner")
-        out = out.merge(self._get_review_scores(m=m), on="stall_id", how="left")
+        out = base.merge(filtered_menu_df[["stall_id"]].drop_duplicates(), on="stall_id", how="inner", validate="one_to_one")
+        out = out.merge(self._get_review_scores(m=m), on="stall_id", how="left", validate="many_to_one")
         out["n_reviews"] = out.get("n_reviews", 0).fillna(0).astype(int)
         out["avg_rating"] = out.get("avg_rating", 0.0).fillna(0.0)
         out["bayes_score"] = out.get("bayes_score", 0.0).fillna(0.0)
 
         if coords is not None and self.lat_col and self.lng_col and self.lat_col in out.columns and self.lng_col in out.columns:
-            out["distance_km"] = out.apply(
-                lambda r: haversine_km(coords[0], coords[1], float(r[self.lat_col]), float(r[self.lng_col]))
-                if pd.notna(r[self.lat_col]) and pd.notna(r[self.lng_col]) else float("inf"),
-                axis=1,
-            )
+            dist = haversine_km_array(coords[0], coords[1], out[self.lat_col], out[self.lng_col])
+            out["distance_km"] = np.where(np.isnan(dist), np.inf, dist)
             out = out[out["distance_km"] <= float(radius_km)].copy()
             out = out.sort_values(["distance_km", "bayes_score", "avg_rating", "n_reviews"], ascending=[True, False, False, False])
         else:
             out = out.sort_values(["bayes_score", "avg_rating", "n_reviews"], ascending=[False, False, False])
         return out.head(int(top_n)).reset_index(drop=True)
 
+    def get_filtered_menu(self, prefs: CuisinePreferences) -> pd.DataFrame:
+        # callers tend to repeat the same preferences back to back, so keep the last result (read-only)
+        key = (
+            tuple(sorted(c.lower() for c in prefs.cuisines)),
+            tuple(sorted(normalize_allergen_values(prefs.allergens_to_avoid))),
+        )
+        cached = self._last_filter
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        df = self._apply_pref_filters(self.merged_df, prefs)
+        self._last_filter = (key, df)
+        return df
+
     def get_top_nearby_stalls(
         self,
         prefs: CuisinePreferences,
@@ -222,22 +472,15 @@ class CuisineFeatureHandler:
         trip_start: str | None = None,
         trip_end: str | None = None,
     ) -> pd.DataFrame:
-        df = self._apply_pref_filters(self.merged_df, prefs)
+        df = self.get_filtered_menu(prefs)
         df = self._apply_trip_filter(df, trip_start, trip_end)
         return self._aggregate_stalls(df, coords, radius_km, top_n, m)
 
     def get_menu_for_stall(self, stall_id: int, prefs: CuisinePreferences | None = None) -> pd.DataFrame:
-        out = self.merged_df[self.merged_df["stall_id"] == int(stall_id)].copy()
-
-        if prefs and prefs.cuisines and "cuisine_type" in out.columns:
-            wanted = [c.lower() for c in prefs.cuisines]
-            out = out[out["cuisine_type"].astype(str).str.lower().apply(lambda x: any(w in x for w in wanted))]
-
-        if prefs and prefs.allergens_to_avoid and "allergens" in out.columns:
-            blocked = normalize_allergen_values(prefs.allergens_to_avoid)
-            out = out[~out["allergens"].astype(str).str.lower().apply(
-                lambda x: any(b in normalize_allergen_values(self._split_cell(x)) for b in blocked)
-            )]
+        out = self.merged_df.iloc[self._stall_rows([int(stall_id)])]
+        if prefs:
+            out = out.loc[self._pref_mask(out, prefs)]
+        out = out.copy()
 
         if "price" in out.columns:
             out["price"] = pd.to_numeric(out["price"], errors="coerce")
@@ -256,6 +499,16 @@ class CuisineFeatureHandler:
         ids = [int(x) for x in stall_ids if str(x).strip()]
         if not ids:
             return pd.DataFrame()
-        df = self.merged_df[self.merged_df["stall_id"].isin(ids)].copy()
+        df = self.merged_df.iloc[self._stall_rows(list(dict.fromkeys(ids)))]
         df = self._apply_trip_filter(df, trip_start, trip_end)
         return self._aggregate_stalls(df, coords, radius_km, max(5, len(ids)), 20.0)
+
+
+_handler: Optional[CuisineFeatureHandler] = None
+
+def get_handler() -> CuisineFeatureHandler:
+    # one lazily built handler shared by every caller in the process
+    global _handler
+    if _handler is None:
+        _handler = CuisineFeatureHandler()
+    return _handler
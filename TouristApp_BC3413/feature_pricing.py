@@ -3,10 +3,11 @@ from __future__ import annotations
 import os
 from typing import Tuple
 
+import numpy as np
 import pandas as pd
 
 
-from features_location import haversine_km, Coord
+from features_location import haversine_km_array, Coord
 
 class PriceFeatureHandler:
     def __init__(self, project_root: str | None = None):
@@ -60,9 +61,11 @@ class PriceFeatureHandler:
         open_ids = self._get_open_hawker_ids(trip_start, trip_end)
         if not open_ids:
             return df
-        out = df.copy()
-        out["hawker_center_id"] = pd.to_numeric(out["hawker_center_id"], errors="coerce")
-        return out[out["hawker_center_id"].isin(open_ids)].copy()
+        ids = pd.to_numeric(df["hawker_center_id"], errors="coerce")
+        keep = ids.isin(open_ids)
+        out = df.loc[keep].copy()
+        out["hawker_center_id"] = ids[keep]
+        return out
 
     def get_top_price_recommendations(
         self,
@@ -73,39 +76,37 @@ class PriceFeatureHandler:
         trip_start: str | None = None,
         trip_end: str | None = None,
     ) -> pd.DataFrame:
-        df = self.menu_df.copy()
-        if "price" not in df.columns:
+        if "price" not in self.menu_df.columns:
             return pd.DataFrame()
-        df["price"] = pd.to_numeric(df["price"], errors="coerce")
-        df = df[df["price"] <= float(max_price)].copy()
+        # filter on a numeric view of the price column; menu_df itself is never copied
+        price = pd.to_numeric(self.menu_df["price"], errors="coerce")
+        hit = (price <= float(max_price)).to_numpy()
 
-        if df.empty:
+        if not hit.any():
             return pd.DataFrame()
 
-        stall_agg = df.groupby("stall_id", as_index=False).agg(
-            matching_max_price=("price", "max"),
-            matching_items=("stall_id", "count"),
+        stall_agg = (
+            price[hit]
+            .groupby(self.menu_df["stall_id"].to_numpy()[hit])
+            .agg(matching_max_price="max", matching_items="count")
+            .rename_axis("stall_id")
+            .reset_index()
         )
-        out = stall_agg.merge(self.stalls_df, on="stall_id", how="left")
+        out = stall_agg.merge(self.stalls_df, on="stall_id", how="left", validate="one_to_one")
 
         if self.hawker_id_col and "hawker_center_id" in out.columns:
             keep = [c for c in [self.hawker_id_col, self.hawker_name_col, self.lat_col, self.lng_col, "address_myenv", "google_3d_view", "photourl"] if c]
-            hc = self.hc_df[keep].copy()
-            out = out.merge(hc, left_on="hawker_center_id", right_on=self.hawker_id_col, how="left")
-            if self.hawker_name_col and self.hawker_name_col in out.columns:
-                out = out.rename(columns={self.hawker_name_col: "hawker_name"})
+            hc = self.hc_df[keep].rename(columns={self.hawker_id_col: "hawker_center_id", self.hawker_name_col: "hawker_name"})
+            out = out.merge(hc, on="hawker_center_id", how="left", validate="many_to_one")
 
         out = self._apply_trip_filter(out, trip_start, trip_end)
-        out = out.merge(self._reviews_summary(), on="stall_id", how="left")
+        out = out.merge(self._reviews_summary(), on="stall_id", how="left", validate="many_to_one")
         out["n_reviews"] = out.get("n_reviews", 0).fillna(0).astype(int)
         out["avg_rating"] = out.get("avg_rating", 0.0).fillna(0.0)
 
         if coords is not None and self.lat_col and self.lng_col and self.lat_col in out.columns and self.lng_col in out.columns:
-            out["distance_km"] = out.apply(
-                lambda r: haversine_km(coords[0], coords[1], float(r[self.lat_col]), float(r[self.lng_col]))
-                if pd.notna(r[self.lat_col]) and pd.notna(r[self.lng_col]) else float("inf"),
-                axis=1,
-            )
+            dist = haversine_km_array(coords[0], coords[1], out[self.lat_col], out[self.lng_col])
+            out["distance_km"] = np.where(np.isnan(dist), np.inf, dist)
             out = out[out["distance_km"] <= float(radius_km)].copy()
         else:
             out["distance_km"] = float("inf")
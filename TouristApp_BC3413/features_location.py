@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import json
 import os
+import tempfile
+import threading
 from typing import Dict, List, Optional, Tuple
 Coord = Tuple[float, float]
 
 
+import numpy as np
 import pandas as pd
 
 try:
@@ -19,16 +23,56 @@ except ModuleNotFoundError:
 
 
 
-#added this haversine km
-def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    import math
+GEOCODE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "sg_hawker", "geocode.json")
+_geocode_cache: Optional[Dict[str, List[float]]] = None
+_geocode_lock = threading.Lock()
+
+
+def _get_geocode_cache() -> Dict[str, List[float]]:
+    global _geocode_cache
+    if _geocode_cache is None:
+        with _geocode_lock:
+            if _geocode_cache is None:
+                try:
+                    with open(GEOCODE_CACHE_PATH, encoding="utf-8") as f:
+                        _geocode_cache = json.load(f)
+                except (OSError, ValueError):
+                    _geocode_cache = {}
+    return _geocode_cache
+
+
+def _remember_geocode(key: str, coords: Coord) -> None:
+    cache = _get_geocode_cache()
+    # Flask serves requests on threads: one writer at a time, dumping a snapshot of the dict
+    with _geocode_lock:
+        cache[key] = [coords[0], coords[1]]
+        snapshot = dict(cache)
+        # write to a unique temp file and swap it in so a crash never leaves half a JSON file behind
+        tmp_path = None
+        try:
+            cache_dir = os.path.dirname(GEOCODE_CACHE_PATH)
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=cache_dir, suffix=".tmp", delete=False) as f:
+                tmp_path = f.name
+                json.dump(snapshot, f)
+            os.replace(tmp_path, GEOCODE_CACHE_PATH)
+        except OSError:
+            if tmp_path and os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+
+# haversine great-circle distance from one point to whole arrays of points (NaN where coords are missing)
+def haversine_km_array(lat: float, lon: float, lats, lons) -> np.ndarray:
     r = 6371.0
-    p1 = math.radians(lat1)
-    p2 = math.radians(lat2)
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dlon / 2) ** 2
-    return 2 * r * math.asin(math.sqrt(a))
+    p1 = np.radians(lat)
+    p2 = np.radians(np.asarray(lats, dtype=float))
+    dlat = p2 - p1
+    dlon = np.radians(np.asarray(lons, dtype=float)) - np.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dlon / 2) ** 2
+    return 2 * r * np.arcsin(np.sqrt(a))
 
 class LocationPlanner:
     def __init__(self, project_root: str = None):
@@ -53,6 +97,10 @@ class LocationPlanner:
         address_or_postal = (address_or_postal or "").strip()
         if not address_or_postal:
             return None
+        key = address_or_postal.lower()
+        cached = _get_geocode_cache().get(key)
+        if cached:
+            return float(cached[0]), float(cached[1])
         if requests is None:
             return LocationPlanner._prompt_manual_coords(address_or_postal) if prompt_on_fail else None
         try:
@@ -64,7 +112,9 @@ class LocationPlanner:
             data = resp.json()
             if data.get("found", 0) > 0 and data.get("results"):
                 r0 = data["results"][0]
-                return float(r0["LATITUDE"]), float(r0["LONGITUDE"])
+                coords = float(r0["LATITUDE"]), float(r0["LONGITUDE"])
+                _remember_geocode(key, coords)
+                return coords
             print(f"OneMap could not find: {address_or_postal}")
             return LocationPlanner._prompt_manual_coords(address_or_postal) if prompt_on_fail else None
         except Exception as e:
@@ -101,32 +151,41 @@ class LocationPlanner:
         dist_km = LocationPlanner._distance_km(start, end)
         return float(dist_km), float(dist_km * 12.0)
 
+    @staticmethod
+    def _nn_route(start: Coord, lats: np.ndarray, lons: np.ndarray, max_stops: int) -> List[int]:
+        # greedy nearest-neighbour walk on straight-line distance; returns row positions in visiting order
+        active = ~(np.isnan(lats) | np.isnan(lons))
+        order: List[int] = []
+        cur_lat, cur_lon = start
+        while active.any() and len(order) < max_stops:
+            dist = haversine_km_array(cur_lat, cur_lon, lats, lons)
+            dist[~active] = np.inf
+            idx = int(dist.argmin())
+            order.append(idx)
+            active[idx] = False
+            cur_lat, cur_lon = lats[idx], lons[idx]
+        return order
+
     def build_stall_itinerary(self, start_coords: Coord, stalls_df: pd.DataFrame, max_stops: int = 5):
         required = {"latitude_hc", "longitude_hc", "stall_name"}
         if stalls_df is None or stalls_df.empty or not required.issubset(set(stalls_df.columns)):
             return [], 0.0, 0.0
         route: List[Dict] = []
-        remaining = stalls_df.copy().drop_duplicates(subset=["stall_id"]).head(max(5, max_stops))
+        candidates = stalls_df.drop_duplicates(subset=["stall_id"]).head(max(5, max_stops))
+        lats = pd.to_numeric(candidates["latitude_hc"], errors="coerce").to_numpy(dtype=float)
+        lons = pd.to_numeric(candidates["longitude_hc"], errors="coerce").to_numpy(dtype=float)
         current = start_coords
         total_km = 0.0
         total_mins = 0.0
-        while not remaining.empty and len(route) < max_stops:
-            best_idx = None
-            best_dist = float("inf")
-            best_time = 0.0
-            for idx, row in remaining.iterrows():
-                end = (float(row["latitude_hc"]), float(row["longitude_hc"]))
-                dist_km, time_mins = self._route_walk_km_mins(current, end)
-                if dist_km < best_dist:
-                    best_idx = idx
-                    best_dist = dist_km
-                    best_time = time_mins
-            chosen = remaining.loc[best_idx].to_dict()
-            chosen["leg_dist_km"] = best_dist
-            chosen["leg_time_mins"] = best_time
-            total_km += best_dist
-            total_mins += best_time
+        # order on straight-line distance, then ask OneMap only for the legs actually walked
+        for pos in self._nn_route(start_coords, lats, lons, max_stops):
+            end = (float(lats[pos]), float(lons[pos]))
+            dist_km, time_mins = self._route_walk_km_mins(current, end)
+            chosen = candidates.iloc[pos].to_dict()
+            chosen["leg_dist_km"] = dist_km
+            chosen["leg_time_mins"] = time_mins
+            total_km += dist_km
+            total_mins += time_mins
             route.append(chosen)
-            current = (float(chosen["latitude_hc"]), float(chosen["longitude_hc"]))
-            remaining = remaining.drop(best_idx)
+            current = end
         return route, total_km, total_mins
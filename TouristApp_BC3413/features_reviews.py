@@ -19,6 +19,9 @@ class ReviewFeature:
         self.stalls_df = pd.read_csv(self.stalls_path)
         self.reviews_df = pd.read_csv(self.reviews_path)
 
+        self._user_lc: Optional[pd.Series] = None
+        self._user_lc_src: Optional[pd.DataFrame] = None
+
         self._detect_columns()
         self._normalize_reviews_df()
         self._init_db()
@@ -92,15 +95,26 @@ class ReviewFeature:
         self.reviews_df[self.review_stall_id_col] = pd.to_numeric(self.reviews_df[self.review_stall_id_col], errors="coerce")
         self.reviews_df[self.review_id_col] = pd.to_numeric(self.reviews_df[self.review_id_col], errors="coerce")
 
-        self.reviews_df[self.verified_col] = (
-            self.reviews_df[self.verified_col].astype(str).str.strip().str.lower().isin(["true", "1", "yes", "y"])
-        )
+        # read_csv already parses a clean True/False column to bool; only free-form flags need normalising
+        if not pd.api.types.is_bool_dtype(self.reviews_df[self.verified_col]):
+            # only a handful of distinct spellings, so normalise those and match rows by plain equality
+            flags = self.reviews_df[self.verified_col]
+            truthy = [v for v in flags.dropna().unique() if str(v).strip().lower() in {"true", "1", "yes", "y"}]
+            self.reviews_df[self.verified_col] = flags.isin(truthy)
         dt = pd.to_datetime(self.reviews_df[self.date_col], format="%Y-%m-%d", errors="coerce", utc=True)
         dt = dt.fillna(pd.Timestamp.now(tz="UTC"))
         self.reviews_df[self.date_col] = dt.dt.strftime("%Y-%m-%d")
 
         self.stalls_df[self.stall_name_col] = self.stalls_df[self.stall_name_col].astype(str)
         self.stalls_df[self.stall_id_col] = pd.to_numeric(self.stalls_df[self.stall_id_col], errors="coerce")
+        self._stall_name_lc = self.stalls_df[self.stall_name_col].str.lower()
+
+    def _user_names_lc(self) -> pd.Series:
+        # lower-cased reviewer names, rebuilt only when reviews_df is replaced (main.py does that on append)
+        if self._user_lc_src is not self.reviews_df:
+            self._user_lc = self.reviews_df[self.user_col].astype(str).str.lower()
+            self._user_lc_src = self.reviews_df
+        return self._user_lc
 
     def _db_rows_to_df(self, rows: list) -> pd.DataFrame:
         if not rows:
@@ -128,12 +142,11 @@ class ReviewFeature:
         if not keyword:
             return pd.DataFrame(columns=self.stalls_df.columns)
 
-        tmp = self.stalls_df.copy()
-        tmp["_name_lc"] = tmp[self.stall_name_col].astype(str).str.lower()
-        exact = tmp[tmp["_name_lc"] == keyword]
-        partial = tmp[tmp["_name_lc"].str.contains(keyword, na=False)]
+        names = self._stall_name_lc
+        exact = self.stalls_df[names == keyword]
+        partial = self.stalls_df[names.str.contains(keyword, na=False)]
         out = pd.concat([exact, partial], ignore_index=True).drop_duplicates(subset=[self.stall_id_col])
-        return out.head(limit).drop(columns=["_name_lc"], errors="ignore").reset_index(drop=True)
+        return out.head(limit).reset_index(drop=True)
 
     def get_reviews_for_stall(self, stall_id: int, limit: int = 200) -> pd.DataFrame:
         csv_df = self.reviews_df[self.reviews_df[self.review_stall_id_col] == int(stall_id)].copy()
@@ -157,13 +170,12 @@ class ReviewFeature:
             left_on=self.review_stall_id_col,
             right_on=self.stall_id_col,
             how="left",
+            validate="many_to_one",
         )
         return df.drop(columns=["_date_sort"], errors="ignore")
 
     def get_reviews_by_user(self, username: str) -> pd.DataFrame:
-        csv_df = self.reviews_df[
-            self.reviews_df[self.user_col].astype(str).str.lower() == username.lower()
-        ].copy()
+        csv_df = self.reviews_df[self._user_names_lc() == username.lower()].copy()
 
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
@@ -184,6 +196,7 @@ class ReviewFeature:
             left_on=self.review_stall_id_col,
             right_on=self.stall_id_col,
             how="left",
+            validate="many_to_one",
         )
         return df.drop(columns=["_date_sort"], errors="ignore")
 
@@ -254,10 +267,12 @@ class ReviewFeature:
 
     def get_display_rows(self, df: pd.DataFrame) -> list[dict]:
         rows: list[dict] = []
-        for _, row in df.iterrows():
+        # plain dicts per row instead of iterrows, which boxes every cell into a Series
+        for row in df.to_dict(orient="records"):
+            review_id = pd.to_numeric(row.get(self.review_id_col), errors="coerce")
             rows.append(
                 {
-                    "review_id": int(pd.to_numeric(row.get(self.review_id_col), errors="coerce")) if pd.notna(pd.to_numeric(row.get(self.review_id_col), errors="coerce")) else None,
+                    "review_id": int(review_id) if pd.notna(review_id) else None,
                     "reviewer_name": str(row.get(self.user_col, "Anonymous") or "Anonymous"),
                     "review": str(row.get(self.text_col, "") or ""),
                     "rating": float(pd.to_numeric(row.get(self.rating_col), errors="coerce") or 0.0),
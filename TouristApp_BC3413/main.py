@@ -218,33 +218,18 @@ def run_cuisine_price_flow(
         prefs.cuisines = [x.strip() for x in raw_c.split(",") if x.strip()]
         cuisine_handler.save_preferences(prefs,username)
 
-    filtered_rows = []
-
-    for _, row in top.iterrows():
-        stall_id = int(row["stall_id"])
-        menu = cuisine_handler.get_menu_for_stall(stall_id, CuisinePreferences(cuisines=prefs.cuisines))
-
-        if menu.empty:
-            continue
-
-        if "price" in menu.columns:
-            menu = menu.copy()
-            menu["price"] = pd.to_numeric(menu["price"], errors = "coerce")
-            menu = menu[menu["price"] <= float(max_price)].copy()
-
-        if menu.empty:
-            continue
-
-        new_row = row.copy()
-        new_row["matching_max_price"] = menu["price"].max() if "price" in menu.columns else 0.0
-        new_row["matching_items"] = len(menu)
-        filtered_rows.append(new_row)
-
-    if not filtered_rows:
+    # filter the menu by cuisine once and aggregate per stall, rather than one menu lookup per stall
+    menu = cuisine_handler.get_filtered_menu(CuisinePreferences(cuisines=prefs.cuisines))
+    price = pd.to_numeric(menu["price"], errors="coerce")
+    hit = menu["stall_id"].isin(top["stall_id"]) & (price <= float(max_price))
+    matches = price[hit].groupby(menu["stall_id"][hit]).agg(matching_max_price="max", matching_items="count")
+
+    top = top.drop(columns=["matching_max_price", "matching_items"], errors="ignore")
+    top = top.join(matches, on="stall_id", how="inner")
+    if top.empty:
         print("No stalls matched both your price and cuisine preferences.")
         return
 
-    top = pd.DataFrame(filtered_rows)
     sort_cols = []
     ascending = []
 
@@ -318,8 +303,8 @@ def run_cuisine_price_flow(
             )
             id_to_name = {}
             if not stalls_df.empty and "stall_id" in stalls_df.columns and "stall_name" in stalls_df.columns:
-                for _, row in stalls_df.iterrows():
-                    id_to_name[int(row["stall_id"])] = row.get("stall_name", "Unknown stall")
+                for row in stalls_df.itertuples(index=False):
+                    id_to_name[int(row.stall_id)] = row.stall_name
 
             print("\nYour current itinerary:")
             for i, sid in enumerate(current_stalls, 1):
@@ -451,7 +436,8 @@ def choose_index(max_n: int, prompt: str = "Choose number (0 to go back): ") ->
         print("Invalid choice.")
 
 def save_reviews_csv(reviews: ReviewFeature) -> None:
-    reviews.reviews_df.to_csv(reviews.reviews_path, index=False)
+    # reviews.csv is large; write it in slices rather than formatting the whole file in one buffer
+    reviews.reviews_df.to_csv(reviews.reviews_path, index=False, chunksize=100_000)
 
 def nearby_top_stalls_for_reviews(
     reviews: ReviewFeature,
@@ -489,7 +475,7 @@ def nearby_top_stalls_for_reviews(
         return
 
     print("\nTop stalls nearby:")
-    for i, row in top.iterrows():
+    for i, row in enumerate(top.to_dict("records")):
         stall = row.get("stall_name", "Unknown stall")
         hawker = row.get("hawker_name", "Unknown hawker centre")
         dist = row.get("distance_km")
@@ -516,8 +502,8 @@ def read_reviews_flow(reviews: ReviewFeature) -> None:
     matches = matches[[c for c in ["stall_id", "stall_name"] if c in matches.columns]].drop_duplicates().head(15).reset_index(drop=True)
 
     print("\nMatching stalls:")
-    for i, row in matches.iterrows():
-        print(f"[{i + 1}] {row['stall_name']}")
+    for i, row in enumerate(matches.itertuples(index=False), 1):
+        print(f"[{i}] {row.stall_name}")
 
     idx = choose_index(len(matches), "Choose stall (0 to go back): ")
     if idx is None:
@@ -545,12 +531,13 @@ def read_reviews_flow(reviews: ReviewFeature) -> None:
     df = df.head(how_many).reset_index(drop=True)
 
     print("")
-    for i, row in df.iterrows():
+    for i, row in enumerate(df.to_dict("records")):
         reviewer = row.get("user_name", "Anonymous")
         review_text = row.get("review_text", "")
         rating = float(row.get("rating", 0.0) or 0.0)
         helpful = int(row.get("helpful_count", 0) or 0)
-        verified = "Yes" if str(row.get("is_verified_purchase", False)).lower() in {"true", "1", "yes", "y"} or row.get("is_verified_purchase") is True else "No"
+        flag = row.get(reviews.verified_col, False)
+        verified = "Yes" if pd.notna(flag) and bool(flag) else "No"
         dt = pd.to_datetime(row.get("review_date"), errors="coerce")
         date_only = dt.strftime("%Y-%m-%d") if pd.notna(dt) else "N/A"
 
@@ -599,8 +586,8 @@ def write_review_flow(reviews: ReviewFeature, username: str) -> None:
     matches = matches[[c for c in ["stall_id", "stall_name"] if c in matches.columns]].drop_duplicates().head(15).reset_index(drop=True)
 
     print("\nMatching stalls:")
-    for i, row in matches.iterrows():
-        print(f"[{i + 1}] {row['stall_name']}")
+    for i, row in enumerate(matches.itertuples(index=False), 1):
+        print(f"[{i}] {row.stall_name}")
 
     idx = choose_index(len(matches), "Choose stall (0 to go back): ")
     if idx is None:
@@ -674,7 +661,7 @@ def run_reviews_flow(
 def _print_stall_cards(df, show_price: bool = False) -> None:
     print("\nTop Recommended Stalls:")
     print("-" * 70)
-    for i, (_, row) in enumerate(df.iterrows(), 1):
+    for i, row in enumerate(df.to_dict("records"), 1):
         stall = row.get("stall_name", "Unknown stall")
         hawker = row.get("hawker_name", "Unknown hawker centre")
         dist = row.get("distance_km")
@@ -721,8 +708,8 @@ def prompt_saved_stalls_on_login(
             )
             id_to_name = {}
             if not stalls_df.empty and "stall_id" in stalls_df.columns and "stall_name" in stalls_df.columns:
-                for _, row in stalls_df.iterrows():
-                    id_to_name[int(row["stall_id"])] = row.get("stall_name", "Unknown stall")
+                for row in stalls_df.itertuples(index=False):
+                    id_to_name[int(row.stall_id)] = row.stall_name
 
             print("\nYour previously saved stalls:")
             for i, stall_id in enumerate(saved_stalls, 1):
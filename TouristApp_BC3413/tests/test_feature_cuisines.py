@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feature_cuisines import CuisineFeatureHandler, CuisinePreferences
+
+
+def _write(path, df):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_csv(path, index=False)
+
+
+@pytest.fixture
+def handler(tmp_path):
+    menu_dir = tmp_path / "dataset" / "Multiple Stalls Menu and Data"
+    hc_dir = tmp_path / "dataset" / "Hawker Centre Data"
+    _write(str(menu_dir / "stalls.csv"), pd.DataFrame({
+        "stall_id": [1, 2, 3],
+        "stall_name": ["Chicken Rice", "Nasi Lemak", "Mystery Stall"],
+        "cuisine_type": ["Chinese", "Malay", None],
+        "hawker_center_id": [10, 10, 20],
+    }))
+    _write(str(menu_dir / "menu_items.csv"), pd.DataFrame({
+        "stall_id": [1, 2, 2, 3, 4],
+        "item_name": ["Rice", "Nasi", "Otah", "Thing", "Orphan"],
+        "price": [4.0, 3.5, 2.0, 5.0, 1.0],
+        "allergens": ["soy", "egg, nuts", "fish", "", "NA"],
+    }))
+    _write(str(menu_dir / "reviews.csv"), pd.DataFrame({"stall_id": [1], "rating": [5]}))
+    _write(str(hc_dir / "DatesofHawkerCentresClosure.csv"), pd.DataFrame({
+        "serial_no": [10, 20],
+        "name": ["Maxwell", "Tekka"],
+        "latitude_hc": [1.28, 1.30],
+        "longitude_hc": [103.84, 103.85],
+    }))
+    return CuisineFeatureHandler(project_root=str(tmp_path))
+
+
+@pytest.mark.parametrize("cuisines", [["na"], ["an"], ["malay"], ["chinese", "nan"]])
+def test_cuisine_index_matches_mask_for_missing_cuisines(handler, cuisines):
+    prefs = CuisinePreferences(cuisines=cuisines)
+    merged = handler.merged_df
+    fast = handler._apply_pref_filters(merged, prefs)
+    # a copy is not merged_df, so it takes the plain per-category mask path
+    slow = handler._apply_pref_filters(merged.copy(), prefs)
+    assert fast["item_name"].tolist() == slow["item_name"].tolist()
+
+
+def test_missing_cuisine_rows_are_indexed(handler):
+    # stall 3 has no cuisine and stall 4 is not in stalls.csv; both match "nan"
+    rows = handler._apply_pref_filters(handler.merged_df, CuisinePreferences(cuisines=["nan"]))
+    assert sorted(rows["item_name"]) == ["Orphan", "Thing"]
+
+
+def test_available_allergens_keep_literal_na(handler):
+    # "NA" is a real allergen token in the menu data, not a missing value
+    assert handler.get_available_allergens() == ["egg", "fish", "na", "nuts", "soy"]